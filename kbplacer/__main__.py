@@ -1,17 +1,31 @@
 import argparse
 import logging
 import os
+import re
 import sys
-from typing import List
-
-import pcbnew
+from typing import Any, Dict, List, Optional
 
 from .defaults import DEFAULT_DIODE_POSITION, ZERO_POSITION
 from .element_position import ElementInfo, ElementPosition, PositionOption, Side
-from .kbplacer_plugin import PluginSettings, run
 
 logger = logging.getLogger(__name__)
 
+# ANNOTATION OPTION [TEMPLATE_PATH | X Y ORIENTATION SIDE]
+ELEMENT_INFO_PATTERN = re.compile(
+    r"^\s*(\S+)\s+(\S+)(?:\s+(\S+)(?:\s+(\S+)\s+(\S+)\s+(\S+))?)?\s*$"
+)
+
+# options accepting single value, which can be parsed without argparse,
+# see `parse_simple_args`
+SIMPLE_OPTIONS = {
+    "-b": "board",
+    "--board": "board",
+    "-l": "layout",
+    "--layout": "layout",
+    "-t": "template",
+    "--template": "template",
+}
+
 
 def check_annotation(value: str) -> None:
     if value.count("{}") != 1:
@@ -22,6 +36,13 @@ def check_annotation(value: str) -> None:
         raise ValueError(err)
 
 
+def get_layout_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "kbplacer")
+
+
 class SwitchElementInfoAction(argparse.Action):
     """Simplified action producing ElementInfo which always use
     `PositionOption.DEFAULT` and `ElementPosition` with x and y 0, i.e. the only
@@ -68,21 +89,26 @@ class ElementInfoAction(argparse.Action):
             raise argparse.ArgumentTypeError(str(e))
         setattr(namespace, self.dest, value)
 
-    def parse(self, values: str, option_string) -> ElementInfo:
-        tokens: list[str] = values.split()
-        err = ""
-        if len(tokens) not in [2, 3, 6]:
+    def parse(
+        self, values: str, option_string, allow_default: bool = True
+    ) -> ElementInfo:
+        match = ELEMENT_INFO_PATTERN.match(values)
+        if not match:
             err = f"{option_string} invalid format."
             raise ValueError(err)
 
-        annotation = tokens[0]
+        annotation, option_name, path_or_x, y, orientation, side = match.groups()
         check_annotation(annotation)
 
-        option = PositionOption.get(tokens[1])
+        option = PositionOption.get(option_name)
+        if option == PositionOption.DEFAULT and not allow_default:
+            err = f"{option_string} does not support DEFAULT position"
+            raise ValueError(err)
+
         position = None
         template_path = ""
 
-        if len(tokens) == 2:
+        if path_or_x is None:
             if option not in [
                 PositionOption.RELATIVE,
                 PositionOption.DEFAULT,
@@ -93,7 +119,7 @@ class ElementInfoAction(argparse.Action):
                     "RELATIVE or DEFAULT if position details not provided"
                 )
                 raise ValueError(err)
-        elif len(tokens) == 3:
+        elif side is None:
             if option not in [PositionOption.PRESET, PositionOption.RELATIVE]:
                 err = (
                     f"{option_string} position option needs to be equal "
@@ -108,15 +134,15 @@ class ElementInfoAction(argparse.Action):
             raise ValueError(err)
 
         if option == PositionOption.CUSTOM:
-            floats = tuple(map(float, tokens[2:5]))
-            side = Side.get(tokens[5])
-            position = ElementPosition(floats[0], floats[1], floats[2], side)
+            position = ElementPosition(
+                float(path_or_x), float(y), float(orientation), Side.get(side)
+            )
         elif option == PositionOption.RELATIVE:
             # template path is optional for RELATIVE option:
-            if len(tokens) == 3:
-                template_path = tokens[2]
+            if path_or_x is not None:
+                template_path = path_or_x
         elif option == PositionOption.PRESET:
-            template_path = tokens[2]
+            template_path = path_or_x
 
         value: ElementInfo = ElementInfo(
             annotation,
@@ -130,13 +156,12 @@ class ElementInfoAction(argparse.Action):
 class ElementInfoListAction(ElementInfoAction):
     def __call__(self, parser, namespace, values: str, option_string=None) -> None:
         try:
-            if "DEFAULT" in values:
-                msg = f"{option_string} does not support DEFAULT position"
-                raise ValueError(msg)
             value: List[ElementInfo] = []
             tokens: list[str] = values.split(";")
             for token in tokens:
-                element_info: ElementInfo = super().parse(token.strip(), option_string)
+                element_info: ElementInfo = super().parse(
+                    token, option_string, allow_default=False
+                )
                 value.append(element_info)
         except ValueError as e:
             raise argparse.ArgumentTypeError(str(e))
@@ -146,19 +171,66 @@ class ElementInfoListAction(ElementInfoAction):
 class XYAction(argparse.Action):
     def __call__(self, parser, namespace, values: str, option_string=None) -> None:
         try:
-            value = tuple(map(float, values.split()))
-            if len(value) != 2:
+            tokens = values.split(maxsplit=2)
+            if len(tokens) != 2:
                 msg = (
                     f"{option_string} must be exactly two numeric values "
                     "separated by a space."
                 )
                 raise ValueError(msg)
+            x, y = tokens
+            value = (float(x), float(y))
         except ValueError as e:
             raise argparse.ArgumentTypeError(str(e))
         setattr(namespace, self.dest, value)
 
 
-def app() -> None:
+def get_default_args() -> Dict[str, Any]:
+    """Returns default values of all CLI arguments except required `board`.
+    New objects are created on each call because element infos are mutable.
+    """
+    return {
+        "layout": "",
+        "route_switches_with_diodes": False,
+        "route_rows_and_columns": False,
+        "switch": ElementInfo("SW{}", PositionOption.DEFAULT, ZERO_POSITION, ""),
+        "diode": ElementInfo("D{}", PositionOption.DEFAULT, DEFAULT_DIODE_POSITION, ""),
+        "additional_elements": [
+            ElementInfo("ST{}", PositionOption.CUSTOM, ZERO_POSITION, "")
+        ],
+        "key_distance": (19.05, 19.05),
+        "template": "",
+        "build_board_outline": False,
+        "outline_delta": 0.0,
+        "create_from_annotated_layout": False,
+        "switch_footprint": "",
+        "diode_footprint": "",
+        "cache_layout": False,
+        "verbose": False,
+    }
+
+
+def parse_simple_args(
+    argv: List[str], defaults: Dict[str, Any]
+) -> Optional[argparse.Namespace]:
+    """Parses the most common invocations, which use only options from
+    `SIMPLE_OPTIONS`, without building full argparse parser.
+    Returns None if `argv` contains anything else.
+    """
+    if len(argv) % 2 != 0:
+        return None
+    values: Dict[str, str] = {}
+    for option, value in zip(argv[::2], argv[1::2]):
+        dest = SIMPLE_OPTIONS.get(option)
+        if dest is None or dest in values or value.startswith("-"):
+            return None
+        values[dest] = value
+    if "board" not in values:
+        return None
+    return argparse.Namespace(**{**defaults, **values})
+
+
+def create_parser(defaults: Dict[str, Any]) -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Keyboard's key autoplacer",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -171,7 +243,11 @@ def app() -> None:
         help=".kicad_pcb file to be processed or created",
     )
     parser.add_argument(
-        "-l", "--layout", required=False, default="", help="json layout definition file"
+        "-l",
+        "--layout",
+        required=False,
+        default=defaults["layout"],
+        help="json layout definition file",
     )
     parser.add_argument(
         "--route-switches-with-diodes",
@@ -186,7 +262,7 @@ def app() -> None:
     parser.add_argument(
         "-s",
         "--switch",
-        default=ElementInfo("SW{}", PositionOption.DEFAULT, ZERO_POSITION, ""),
+        default=defaults["switch"],
         action=SwitchElementInfoAction,
         help=(
             "Switch information, space separated value of ANNOTATION [ORIENTATION SIDE]\n"
@@ -204,7 +280,7 @@ def app() -> None:
     parser.add_argument(
         "-d",
         "--diode",
-        default=ElementInfo("D{}", PositionOption.DEFAULT, DEFAULT_DIODE_POSITION, ""),
+        default=defaults["diode"],
         action=ElementInfoAction,
         help=(
             "Diode information, space separated value of ANNOTATION OPTION [POSITION]\n"
@@ -222,14 +298,7 @@ def app() -> None:
     )
     parser.add_argument(
         "--additional-elements",
-        default=[
-            ElementInfo(
-                "ST{}",
-                PositionOption.CUSTOM,
-                ZERO_POSITION,
-                "",
-            )
-        ],
+        default=defaults["additional_elements"],
         action=ElementInfoListAction,
         help=(
             "List of ';' separated additional elements ELEMENT_INFO values\n"
@@ -245,7 +314,7 @@ def app() -> None:
     )
     parser.add_argument(
         "--key-distance",
-        default=(19.05, 19.05),
+        default=defaults["key_distance"],
         action=XYAction,
         help=(
             "X and Y key 1U distance in mm, as two space separated numeric values, "
@@ -256,7 +325,7 @@ def app() -> None:
         "-t",
         "--template",
         required=False,
-        default="",
+        default=defaults["template"],
         help="Controller circuit template",
     )
     parser.add_argument(
@@ -268,7 +337,7 @@ def app() -> None:
     parser.add_argument(
         "--outline-delta",
         required=False,
-        default=0.0,
+        default=defaults["outline_delta"],
         type=float,
         help="The amount (in millimetres) to inflate/deflate board outline.",
     )
@@ -284,7 +353,7 @@ def app() -> None:
     parser.add_argument(
         "--switch-footprint",
         required=False,
-        default="",
+        default=defaults["switch_footprint"],
         type=str,
         help=(
             "Full path to switch footprint, required when "
@@ -294,26 +363,58 @@ def app() -> None:
     parser.add_argument(
         "--diode-footprint",
         required=False,
-        default="",
+        default=defaults["diode_footprint"],
         type=str,
         help=(
             "Full path to diode footprint, required when "
             "`--create-from-annotated-layout` option used."
         ),
     )
+    parser.add_argument(
+        "--cache-layout",
+        required=False,
+        action="store_true",
+        help=(
+            "Cache parsed layout in user cache directory and reuse it\n"
+            "when running again with unchanged layout file.\n"
+            "Only the latest version of each layout file is kept."
+        ),
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        required=False,
+        action="store_true",
+        help="Enables debug logging.",
+    )
+
+    return parser
+
+
+def app() -> None:
+    defaults = get_default_args()
+    args = parse_simple_args(sys.argv[1:], defaults)
+    if args is None:
+        args = create_parser(defaults).parse_args()
+
+    # imported after arguments parsing, loading pcbnew is slow and not needed
+    # for `--help` or invalid arguments
+    import pcbnew
 
-    args = parser.parse_args()
+    from .kbplacer_plugin import PluginSettings, run
 
     layout_path = args.layout
     board_path = args.board
 
     # set up logger
     logging.basicConfig(
-        level=logging.DEBUG, format="%(asctime)s: %(message)s", datefmt="%H:%M:%S"
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s: %(message)s",
+        datefmt="%H:%M:%S",
     )
 
     if args.create_from_annotated_layout and os.path.isfile(board_path):
-        logger.error(f"File {board_path} already exist, aborting")
+        logger.error("File %s already exist, aborting", board_path)
         sys.exit(1)
 
     settings = PluginSettings(
@@ -331,6 +432,7 @@ def app() -> None:
         create_from_annotated_layout=args.create_from_annotated_layout,
         switch_footprint=args.switch_footprint,
         diode_footprint=args.diode_footprint,
+        layout_cache_dir=get_layout_cache_dir() if args.cache_layout else "",
     )
     board = run(settings)
 
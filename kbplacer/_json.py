@@ -0,0 +1,13 @@
+"""Thin json loading shim.
+
+Uses `orjson` when available (it is not required, KiCad bundled python
+does not ship it), otherwise falls back to standard library `json`.
+Both accept `bytes` input, so files can be read in binary mode.
+"""
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads  # type: ignore[assignment]
+
+__all__ = ["loads"]
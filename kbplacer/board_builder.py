@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import logging
 import re
 from collections import defaultdict
@@ -10,6 +9,7 @@ from typing import Dict, List, Tuple, Type, Union
 
 import pcbnew
 
+from . import _json
 from .board_modifier import KICAD_VERSION
 from .kle_serial import Keyboard, MatrixAnnotatedKeyboard, get_keyboard
 
@@ -49,7 +49,7 @@ class BoardBuilder:
         self.net_count = self.board.GetNetCount()
 
     def add_footprint(self, footprint: pcbnew.FOOTPRINT) -> pcbnew.FOOTPRINT:
-        logger.info(f"Add {footprint.GetReference()} footprint")
+        logger.info("Add %s footprint", footprint.GetReference())
         self.board.Add(footprint)
         return footprint
 
@@ -71,7 +71,7 @@ class BoardBuilder:
             net = pcbnew.NETINFO_ITEM(self.board, netname, self.net_count)
             if KICAD_VERSION < (8, 0, 0):
                 self.net_info.AppendNet(net)
-            logger.info(f"Add {netname} net")
+            logger.info("Add %s net", netname)
             self.board.Add(net)
             self.net_count += 1
             self.nets[netname] = net
@@ -82,8 +82,8 @@ class BoardBuilder:
         keyboard: Union[str, MatrixAnnotatedKeyboard],
     ) -> pcbnew.BOARD:
         if isinstance(keyboard, str):
-            with open(keyboard, "r", encoding="utf-8") as f:
-                layout = json.load(f)
+            with open(keyboard, "rb") as f:
+                layout = _json.loads(f.read())
                 tmp: Keyboard = get_keyboard(layout)
                 if not isinstance(tmp, MatrixAnnotatedKeyboard):
                     try:
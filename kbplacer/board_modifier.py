@@ -60,7 +60,7 @@ def position_in_cartesian_coordinates(
 
 
 def get_footprint(board: pcbnew.BOARD, reference: str) -> pcbnew.FOOTPRINT:
-    logger.info(f"Searching for {reference} footprint in {board.GetFileName()}")
+    logger.info("Searching for %s footprint in %s", reference, board.GetFileName())
     footprint = board.FindFootprintByReference(reference)
     if footprint is None:
         logger.error("Footprint not found")
@@ -80,7 +80,9 @@ def get_optional_footprint(
 
 
 def set_position(footprint: pcbnew.FOOTPRINT, position: pcbnew.wxPoint) -> None:
-    logger.debug(f"Setting {footprint.GetReference()} footprint position: {position}")
+    logger.debug(
+        "Setting %s footprint position: %s", footprint.GetReference(), position
+    )
     if KICAD_VERSION >= (7, 0, 0):
         footprint.SetPosition(pcbnew.VECTOR2I(position.x, position.y))
     else:
@@ -93,7 +95,9 @@ def set_position_by_points(footprint: pcbnew.FOOTPRINT, x: int, y: int) -> None:
 
 def get_position(footprint: pcbnew.FOOTPRINT) -> pcbnew.wxPoint:
     position = footprint.GetPosition()
-    logger.debug(f"Getting {footprint.GetReference()} footprint position: {position}")
+    logger.debug(
+        "Getting %s footprint position: %s", footprint.GetReference(), position
+    )
     if KICAD_VERSION >= (7, 0, 0):
         return pcbnew.wxPoint(position.x, position.y)
     return position
@@ -257,7 +261,9 @@ class BoardModifier:
                     if p.HitTest(track_start) or p.HitTest(track_end):
                         logger.debug(
                             "Track collision ignored, track starts or ends "
-                            f"in pad {reference}:{pad_name}"
+                            "in pad %s:%s",
+                            reference,
+                            pad_name,
                         )
                     else:
                         hit_test_result = pad_shape.Collide(
@@ -266,7 +272,7 @@ class BoardModifier:
                         on_same_layer = p.IsOnLayer(track.GetLayer())
                         if hit_test_result and on_same_layer:
                             logger.debug(
-                                f"Track collide with pad {reference}:{pad_name}"
+                                "Track collide with pad %s:%s", reference, pad_name
                             )
                             collide_list.append(p)
         # track ids to clear at the end:
@@ -283,7 +289,8 @@ class BoardModifier:
                 ):
                     logger.debug(
                         "Track collision ignored, track starts or ends "
-                        f"at the end of {track_uuid} track"
+                        "at the end of %s track",
+                        track_uuid,
                     )
                     # ignoring one track means that we can ignore
                     # all other connected to it:
@@ -304,14 +311,15 @@ class BoardModifier:
                 elif hit_test_result := t.GetEffectiveShape().Collide(
                     track_shape, get_clearance(t, track)
                 ):
-                    logger.debug(f"Track collide with another track: {track_uuid}")
+                    logger.debug("Track collide with another track: %s", track_uuid)
                     collide_list.append(t)
         for collision in list(collide_list):
             if collision.m_Uuid in tracks_to_clear:
                 collision_uuid = collision.m_Uuid.AsString()
                 logger.debug(
-                    f"Track collision with {collision_uuid} removed due to "
-                    "connection with track which leads to it"
+                    "Track collision with %s removed due to "
+                    "connection with track which leads to it",
+                    collision_uuid,
                 )
                 collide_list.remove(collision)
         return len(collide_list) != 0
@@ -360,7 +368,10 @@ class BoardModifier:
         start = track.GetStart()
         stop = track.GetEnd()
         logger.info(
-            f"Adding track segment ({layer_name}): [{start}, {stop}]",
+            "Adding track segment (%s): [%s, %s]",
+            layer_name,
+            start,
+            stop,
         )
         if not self.test_track_collision(track):
             self.board.Add(track)
@@ -430,7 +441,7 @@ class BoardModifier:
             return
 
         layer = layers[0]
-        logger.debug(f"Routing at {self.board.GetLayerName(layer)} layer")
+        logger.debug("Routing at %s layer", self.board.GetLayerName(layer))
 
         if pad1.GetNetCode() != pad2.GetNetCode():
             logger.warning("Could not route pads of different nets")
@@ -492,14 +503,23 @@ class BoardModifier:
         else:
             logger.warning(
                 "Could not route pads when parent footprints not rotated the same, "
-                f"orientations: {orientation1} and {orientation2}"
+                "orientations: %s and %s",
+                orientation1,
+                orientation2,
             )
             return
 
         logger.debug(
-            f"Routing pad '{pad1.GetParentAsString()}:{pad1.GetPadName()}' at {pos1} "
-            f"with pad '{pad2.GetParentAsString()}:{pad2.GetPadName()}' at {pos2} "
-            f"using coordinate system rotated by {angle} degree(s)"
+            "Routing pad '%s:%s' at %s "
+            "with pad '%s:%s' at %s "
+            "using coordinate system rotated by %s degree(s)",
+            pad1.GetParentAsString(),
+            pad1.GetPadName(),
+            pos1,
+            pad2.GetParentAsString(),
+            pad2.GetPadName(),
+            pos2,
+            angle,
         )
 
         # if in line, use one track segment
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 
@@ -13,7 +14,7 @@ class Side(str, Enum):
     def get(cls, name) -> Side:
         if isinstance(name, str):
             try:
-                return Side(name.title())
+                return _get_side(name)
             except ValueError:
                 # fallback to error below to use 'name' before converting to titlecase
                 pass
@@ -21,8 +22,17 @@ class Side(str, Enum):
         raise ValueError(msg)
 
 
+# Both enums are immutable so lookups can be cached without invalidation.
+# Only successful lookups are cached, invalid names still raise every time.
+@lru_cache(maxsize=None)
+def _get_side(name: str) -> Side:
+    return Side(name.title())
+
+
 @dataclass
 class ElementPosition:
+    __slots__ = ("x", "y", "orientation", "side")
+
     x: float
     y: float
     orientation: float
@@ -43,7 +53,7 @@ class PositionOption(str, Enum):
     def get(cls, name) -> PositionOption:
         if isinstance(name, str):
             try:
-                return PositionOption(name.title())
+                return _get_position_option(name)
             except ValueError:
                 # fallback to error below to use 'name' before converting to titlecase
                 pass
@@ -51,8 +61,15 @@ class PositionOption(str, Enum):
         raise ValueError(msg)
 
 
+@lru_cache(maxsize=None)
+def _get_position_option(name: str) -> PositionOption:
+    return PositionOption(name.title())
+
+
 @dataclass
 class ElementInfo:
+    __slots__ = ("annotation_format", "position_option", "position", "template_path")
+
     annotation_format: str
     position_option: PositionOption
     position: Optional[ElementPosition]
@@ -580,7 +580,7 @@ class KbplacerDialog(wx.Dialog):
         super(KbplacerDialog, self).__init__(parent, -1, title, style=style)
 
         language = get_current_kicad_language()
-        logger.info(f"Language: {language}")
+        logger.info("Language: %s", language)
         self._ = get_plugin_translator(language)
 
         switch_section = self.get_switch_section(
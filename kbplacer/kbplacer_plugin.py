@@ -29,6 +29,7 @@ class PluginSettings:
     create_from_annotated_layout: bool
     switch_footprint: str
     diode_footprint: str
+    layout_cache_dir: str = ""
 
 
 def run(settings: PluginSettings) -> pcbnew.BOARD:
@@ -50,6 +51,7 @@ def run(settings: PluginSettings) -> pcbnew.BOARD:
         settings.route_switches_with_diodes,
         settings.route_rows_and_columns,
         additional_elements=settings.additional_elements,
+        layout_cache_dir=settings.layout_cache_dir,
     )
 
     if settings.generate_outline:
@@ -59,8 +59,8 @@ class KbplacerPluginAction(pcbnew.ActionPlugin):
             filemode="w",
             format="[%(filename)s:%(lineno)d]: %(message)s",
         )
-        logger.info(f"Plugin executed with KiCad version: {version}")
-        logger.info(f"Plugin executed with python version: {repr(sys.version)}")
+        logger.info("Plugin executed with KiCad version: %s", version)
+        logger.info("Plugin executed with python version: %r", sys.version)
 
     def Run(self) -> None:
         self.Initialize()
@@ -70,7 +70,7 @@ class KbplacerPluginAction(pcbnew.ActionPlugin):
         dlg = KbplacerDialog(pcb_frame, "kbplacer", initial_state=self.window_state)
         modal_return = dlg.ShowModal()
         gui_state = dlg.get_window_state()
-        logger.info(f"GUI state: {gui_state}")
+        logger.info("GUI state: %s", gui_state)
 
         if modal_return == wx.ID_OK:
             run_from_gui(self.board_path, gui_state)
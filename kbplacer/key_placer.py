@@ -109,11 +109,11 @@ class KeyMatrix:
                     "each switch should have two unique nets unambiguously defining "
                     "position in key matrix"
                 )
-        logger.debug(f"Switches by nets: {self._switches_references_by_net}")
+        logger.debug("Switches by nets: %s", self._switches_references_by_net)
         diodes_by_switch = {
             k: [f.GetReference() for f in v] for k, v in self._diodes_by_switch.items()
         }
-        logger.debug(f"Diodes by switch: {diodes_by_switch}")
+        logger.debug("Diodes by switch: %s", diodes_by_switch)
 
     def first_switch_number(self) -> int:
         return min(self._switches_by_number.keys())
@@ -244,7 +244,7 @@ class MatrixAnnotatedKeyboardSwitchIterator:
                 *matrix_coordinates
             )
         switches = sorted(switches)
-        logger.debug(f"Got {switches} for {matrix_coordinates} position")
+        logger.debug("Got %s for %s position", switches, matrix_coordinates)
         # assume thar alternative keys have same annotation with
         # some sort of suffix so after sorting
         # the option index would get us correct footprint
@@ -294,7 +294,7 @@ class KeyPlacer(BoardModifier):
         self.__key_distance_y = cast(int, pcbnew.FromMM(key_distance[1]))
 
         logger.debug(
-            f"Set key 1U distance: {self.__key_distance_x}/{self.__key_distance_y}"
+            "Set key 1U distance: %s/%s", self.__key_distance_x, self.__key_distance_y
         )
 
     def apply_switch_connection_template(
@@ -314,7 +314,7 @@ class KeyPlacer(BoardModifier):
         """
         logger.info("Using template replication method")
         if angle != 0:
-            logger.info(f"Routing at {angle} degree angle")
+            logger.info("Routing at %s degree angle", angle)
         switch_position = get_position(switch)
         rejects = []
         for item in template_connection:
@@ -355,7 +355,9 @@ class KeyPlacer(BoardModifier):
         :param diodes: Diodes footprints to be routed.
         """
         for diode in diodes:
-            logger.info(f"Routing {switch.GetReference()} with {diode.GetReference()}")
+            logger.info(
+                "Routing %s with %s", switch.GetReference(), diode.GetReference()
+            )
             if result := get_closest_pads_on_same_net(switch, diode):
                 logger.info("Using internal autorouter method")
                 switch_pad, diode_pad = result
@@ -401,7 +403,7 @@ class KeyPlacer(BoardModifier):
 
         for track in self.board.GetTracks():
             if _is_dangling(track):
-                logger.info(f"Removing {track.m_Uuid.AsString()}")
+                logger.info("Removing %s", track.m_Uuid.AsString())
                 self.board.RemoveNative(track)
                 any_removed = True
 
@@ -415,7 +417,7 @@ class KeyPlacer(BoardModifier):
         connections: List[pcbnew.PCB_TRACK],
         destination_path: str,
     ) -> None:
-        logger.info(f"Saving template to {destination_path}")
+        logger.info("Saving template to %s", destination_path)
         # can't use `CreateEmptyBoard` when running inside KiCad.
         # We want new board file but without new project file,
         # looks like this is not possible with pcbnew API.
@@ -446,7 +448,7 @@ class KeyPlacer(BoardModifier):
         ):
             if p.GetNetCode() != 0:
                 logger.info(
-                    f"Adding net {p.GetNetname()} with netcode {p.GetNetCode()}"
+                    "Adding net %s with netcode %s", p.GetNetname(), p.GetNetCode()
                 )
                 # adding nets to new board will get them new autoassigned netcodes
                 # (the one set at `NETINFO_ITEM` constructor will be discarded)
@@ -463,8 +465,12 @@ class KeyPlacer(BoardModifier):
                 before = p.GetNetCode()
                 p.SetNet(nets[p.GetNetname()])
                 logger.info(
-                    f"Updating pad '{p.GetParentAsString()}:{p.GetPadName()}' "
-                    f"net {p.GetNetname()} netcode: {before} -> {p.GetNetCode()}"
+                    "Updating pad '%s:%s' net %s netcode: %s -> %s",
+                    p.GetParentAsString(),
+                    p.GetPadName(),
+                    p.GetNetname(),
+                    before,
+                    p.GetNetCode(),
                 )
 
         board.Add(switch_copy)
@@ -490,8 +496,8 @@ class KeyPlacer(BoardModifier):
         switch = get_footprint(self.board, key_format.format(1))
 
         logger.info(
-            "Looking for connection template between "
-            f"{switch.GetReference()} and other elements"
+            "Looking for connection template between %s and other elements",
+            switch.GetReference(),
         )
         result = []
         origin = get_position(switch)
@@ -533,7 +539,7 @@ class KeyPlacer(BoardModifier):
             return f"{name} [{start} {end}]"
 
         items_str = ", ".join([_format_item(i) for i in result])
-        logger.info(f"Got connection template: {items_str}")
+        logger.info("Got connection template: %s", items_str)
 
         if destination_path:
             pattern = re.compile(diode_format.format("(\\d)+"))
@@ -589,7 +595,7 @@ class KeyPlacer(BoardModifier):
         key_position: Optional[ElementPosition],
     ) -> None:
         offset = self._calculate_reference_coordinate(keyboard, key_matrix)
-        logger.debug(f"Layout offset: {offset}")
+        logger.debug("Layout offset: %s", offset)
         key_iterator: Iterator = get_key_iterator(keyboard, key_matrix)
         for key, switch_footprint in key_iterator:
             reset_rotation(switch_footprint)
@@ -771,7 +777,7 @@ class KeyPlacer(BoardModifier):
             element.position = self.get_current_relative_element_position(
                 element1, element2
             )
-            logger.info(f"Element info updated: {element}")
+            logger.info("Element info updated: %s", element)
 
     def _prepare_diode_infos(
         self, key_matrix: KeyMatrix, diode_info: ElementInfo
@@ -802,7 +808,7 @@ class KeyPlacer(BoardModifier):
                 temp_info.position = self.get_current_relative_element_position(
                     switch, diode
                 )
-                logger.info(f"Element info updated: {temp_info}")
+                logger.info("Element info updated: %s", temp_info)
                 infos.append(temp_info)
         else:
             infos.append(diode_info)
@@ -823,7 +829,7 @@ class KeyPlacer(BoardModifier):
             )
         elif diode_info.position_option == PositionOption.PRESET:
             logger.info(
-                f"Loading diode connection preset from {diode_info.template_path}"
+                "Loading diode connection preset from %s", diode_info.template_path
             )
             return self.load_connection_preset(
                 key_format,
@@ -841,6 +847,7 @@ class KeyPlacer(BoardModifier):
         route_switches_with_diodes: bool = False,
         route_rows_and_columns: bool = False,
         additional_elements: List[ElementInfo] = [],
+        layout_cache_dir: str = "",
     ) -> None:
         # stage 1 - prepare
         key_matrix = KeyMatrix(
@@ -873,7 +880,7 @@ class KeyPlacer(BoardModifier):
 
         # stage 2 - place elements
         if layout_path:
-            keyboard = get_keyboard_from_file(layout_path)
+            keyboard = get_keyboard_from_file(layout_path, layout_cache_dir)
             if not isinstance(keyboard, MatrixAnnotatedKeyboard):
                 # if not MatrixAnnotatedKeyboard already,
                 # check if it is possible to convert
@@ -889,7 +896,7 @@ class KeyPlacer(BoardModifier):
                 keyboard.collapse()
             self.place_switches(keyboard, key_matrix, key_info.position)
 
-        logger.info(f"Diode info: {diode_infos}")
+        logger.info("Diode info: %s", diode_infos)
         if diode_info.position_option != PositionOption.UNCHANGED:
             self.place_diodes(diode_infos, key_matrix)
 
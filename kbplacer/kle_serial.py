@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import argparse
 import copy
+import hashlib
 import json
 import logging
+import pickle
 import pprint
 import re
 import sys
 from collections import defaultdict
 from dataclasses import asdict, dataclass, field, fields
 from itertools import chain
+from pathlib import Path
 from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
+from . import _json
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_KEY_COLOR = "#cccccc"
@@ -741,16 +746,64 @@ def get_keyboard(layout: dict) -> Keyboard:
     raise RuntimeError(msg)
 
 
-def get_keyboard_from_file(layout_path: str) -> Keyboard:
+def _layout_cache_key(data: bytes) -> str:
+    # version.txt is written by the build hook, editable installs included, and
+    # does not change when parser is edited in development checkout.
+    # Hash parser source as well so stale pickles are never reused.
+    version_file = Path(__file__).parent / "version.txt"
+    version = version_file.read_bytes() if version_file.is_file() else b""
+    source = Path(__file__).read_bytes()
+    return hashlib.sha1(version + b"\0" + source + b"\0" + data).hexdigest()
+
+
+def get_keyboard_from_file(layout_path: str, cache_dir: str = "") -> Keyboard:
+    """Load keyboard from layout file.
+
+    When `cache_dir` is not empty, parsed keyboard is stored there (keyed with
+    hash of layout file content, package version and parser source) and reused
+    on subsequent calls with unchanged layout file. Only the most recent entry
+    of each layout path is kept.
+    """
     # Layout downloaded from keyboard-layout-editor is most likely using utf-8.
-    # Use it explicitly in case the platform locale sets different encoding.
-    with open(layout_path, "r", encoding="utf-8") as f:
-        layout = json.load(f)
-    logger.info(f"User layout: {layout}")
-    return get_keyboard(layout)
+    # Read raw bytes and let json detect encoding, this way platform locale
+    # encoding is never used.
+    with open(layout_path, "rb") as f:
+        data = f.read()
+
+    cache_path = None
+    if cache_dir:
+        path_key = hashlib.sha1(
+            str(Path(layout_path).resolve()).encode("utf-8")
+        ).hexdigest()
+        cache_path = Path(cache_dir) / f"{path_key}-{_layout_cache_key(data)}.pkl"
+        if cache_path.is_file():
+            try:
+                with open(cache_path, "rb") as f:
+                    keyboard = pickle.load(f)
+                logger.info("Using cached layout: %s", cache_path)
+                return keyboard
+            except Exception as e:
+                logger.warning("Failed to load cached layout %s: %s", cache_path, e)
 
+    layout = _json.loads(data)
+    logger.info("User layout: %s", layout)
+    keyboard = get_keyboard(layout)
 
-if __name__ == "__main__":
+    if cache_path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # remove outdated entries of this layout file
+            for stale in cache_path.parent.glob(f"{path_key}-*.pkl"):
+                stale.unlink()
+            with open(cache_path, "wb") as f:
+                pickle.dump(keyboard, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.warning("Failed to save layout cache %s: %s", cache_path, e)
+
+    return keyboard
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="KLE format converter")
     parser.add_argument("-in", required=True, help="Layout file")
     parser.add_argument(
@@ -778,7 +831,7 @@ if __name__ == "__main__":
         help="Ergogen zone filter regular expression, applicable only when -inform ERGOGEN_INTERNAL",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     input_path = getattr(args, "in")
     input_format = args.inform
     output_path = getattr(args, "out")
@@ -788,14 +841,16 @@ if __name__ == "__main__":
 
     if input_format == output_format:
         print("Output format equal input format, nothing to do...")
-        sys.exit(1)
+        return 1
 
-    with open(input_path, "r", encoding="utf-8") as input_file:
+    with open(input_path, "rb") as input_file:
         if input_path.endswith("yaml") or input_path.endswith("yml"):
             try:
                 import yaml
 
-                layout = yaml.safe_load(input_file)
+                # prefer libyaml based loader when PyYAML was built with it
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                layout = yaml.load(input_file, Loader=loader)
             except Exception as e:
                 msg = (
                     "Could not load yaml file, make sure that `PyYAML` installed "
@@ -803,7 +858,7 @@ if __name__ == "__main__":
                 )
                 raise RuntimeError(msg) from e
         else:
-            layout = json.load(input_file)
+            layout = _json.loads(input_file.read())
 
         result = ""
         if input_format == "KLE_RAW":  # convert to KLE_INTERNAL
@@ -841,3 +896,9 @@ if __name__ == "__main__":
         if output_path:
             with open(output_path, "w", encoding="utf-8") as output_file:
                 json.dump(result, output_file, indent=4)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
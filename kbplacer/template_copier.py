@@ -51,9 +51,11 @@ def copy_from_template_to_board(
             net_code = clone.GetNetCode()
             net_info_in_board = board_nets_by_name[net_name]
             logger.info(
-                f"Cloning track from template: {net_name}:{net_code}"
-                f"-> {net_info_in_board.GetNetname()}:"
-                f"{net_info_in_board.GetNetCode()}",
+                "Cloning track from template: %s:%s-> %s:%s",
+                net_name,
+                net_code,
+                net_info_in_board.GetNetname(),
+                net_info_in_board.GetNetCode(),
             )
             clone.SetNet(net_info_in_board)
             board.Add(clone)
@@ -7,7 +7,13 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from kbplacer.__main__ import app
+from kbplacer.__main__ import (
+    app,
+    create_parser,
+    get_default_args,
+    get_layout_cache_dir,
+    parse_simple_args,
+)
 from kbplacer.defaults import DEFAULT_DIODE_POSITION, ZERO_POSITION
 from kbplacer.element_position import ElementInfo, ElementPosition, PositionOption, Side
 from kbplacer.kbplacer_plugin import PluginSettings
@@ -45,8 +51,8 @@ def get_default(board_path: str) -> PluginSettings:
 
 @pytest.fixture
 def cli_isolation(monkeypatch):
-    monkeypatch.setattr("kbplacer.__main__.pcbnew.Refresh", MagicMock())
-    monkeypatch.setattr("kbplacer.__main__.pcbnew.SaveBoard", MagicMock())
+    monkeypatch.setattr("pcbnew.Refresh", MagicMock())
+    monkeypatch.setattr("pcbnew.SaveBoard", MagicMock())
 
     def mock_exit(*args, **kwargs):
         raise ExitTest(*args, **kwargs)
@@ -235,6 +241,20 @@ def expects_settings(default_difference: Dict):
                 match=r"--additional-elements does not support DEFAULT position"
             ),
         ),
+        #   - using DEFAULT position, it is case insensitive
+        (
+            ["--additional-elements", "LED{} default"],
+            pytest.raises(ArgumentTypeError,
+                match=r"--additional-elements does not support DEFAULT position"
+            ),
+        ),
+        #   - 'DEFAULT' in template path is not a position option
+        (
+            ["--additional-elements", "LED{} PRESET /DEFAULT/led.kicad_pcb"],
+            expects_settings({"additional_elements": [
+                ElementInfo("LED{}", PositionOption.PRESET, None, "/DEFAULT/led.kicad_pcb"),
+            ]}),
+        ),
         # valid key-distance option values
         #   - integers
         (
@@ -246,12 +266,31 @@ def expects_settings(default_difference: Dict):
             ["--key-distance", "18.05 19.05"],
             expects_settings({"key_distance": (18.05, 19.05)}),
         ),
+        #   - any whitespace separator
+        (
+            ["--key-distance", "18\t18"],
+            expects_settings({"key_distance": (18, 18)}),
+        ),
         # invalid key-distance option values
-        #   - wrong separator # TODO: error message could be better
+        #   - wrong separator
         (
             ["--key-distance", "18,18"],
             pytest.raises(ArgumentTypeError,
-                match=r"could not convert string to float: '18,18'"
+                match=r"--key-distance must be exactly two numeric values separated by a space."
+            ),
+        ),
+        #   - not a number
+        (
+            ["--key-distance", "18 x"],
+            pytest.raises(ArgumentTypeError,
+                match=r"could not convert string to float: 'x'"
+            ),
+        ),
+        #   - empty value
+        (
+            ["--key-distance", ""],
+            pytest.raises(ArgumentTypeError,
+                match=r"--key-distance must be exactly two numeric values separated by a space."
             ),
         ),
         #   - too many tokens
@@ -261,6 +300,16 @@ def expects_settings(default_difference: Dict):
                 match=r"--key-distance must be exactly two numeric values separated by a space."
             ),
         ),
+        # layout cache enabled
+        (
+            ["--cache-layout"],
+            expects_settings({"layout_cache_dir": get_layout_cache_dir()}),
+        ),
+        # verbose logging does not change run settings
+        (
+            ["--verbose"],
+            expects_settings({}),
+        ),
         # some more complex scenarios combining multiple options:
         (
             ["--key-distance", "18 18.05", "--diode", "DIODE{} CUSTOM 1.5 -2.05 180.0 FRONT",
@@ -280,7 +329,7 @@ def test_cli_arguments(
     monkeypatch, cli_isolation, fake_board, extra_args, expectation
 ) -> None:
     run_mock = Mock()
-    monkeypatch.setattr("kbplacer.__main__.run", run_mock)
+    monkeypatch.setattr("kbplacer.kbplacer_plugin.run", run_mock)
 
     args = ["--board", fake_board] + extra_args
     with cli_isolation(args):
@@ -298,7 +347,7 @@ def test_board_creation_when_exist(
     caplog, monkeypatch, cli_isolation, fake_board
 ) -> None:
     run_mock = Mock()
-    monkeypatch.setattr("kbplacer.__main__.run", run_mock)
+    monkeypatch.setattr("kbplacer.kbplacer_plugin.run", run_mock)
 
     args = ["--board", fake_board, "--create-from-annotated-layout"]
     with cli_isolation(args):
@@ -307,3 +356,30 @@ def test_board_creation_when_exist(
 
     run_mock.assert_not_called()
     assert caplog.records[0].message == f"File {fake_board} already exist, aborting"
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--board", "keyboard.kicad_pcb"],
+        ["-b", "keyboard.kicad_pcb", "-l", "kle.json"],
+        ["-l", "kle.json", "--template", "template.kicad_pcb", "-b", "kb.kicad_pcb"],
+    ],
+)
+def test_simple_args_equal_full_parser(args) -> None:
+    result = parse_simple_args(args, get_default_args())
+    assert result == create_parser(get_default_args()).parse_args(args)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--layout", "kle.json"],
+        ["--board", "keyboard.kicad_pcb", "--route-rows-and-columns"],
+        ["--board", "keyboard.kicad_pcb", "--board", "other.kicad_pcb"],
+        ["--board=keyboard.kicad_pcb"],
+        ["--help"],
+    ],
+)
+def test_simple_args_fallback(args) -> None:
+    assert parse_simple_args(args, get_default_args()) is None
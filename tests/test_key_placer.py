@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import copy
+import functools
 import json
-from typing import List, Tuple
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
 
 import pcbnew
 import pytest
@@ -12,14 +13,12 @@ from kbplacer.defaults import ZERO_POSITION
 from .conftest import (
     add_diode_footprint,
     add_switch_footprint,
-    equal_ignore_order,
     generate_render,
     update_netinfo,
 )
 
 try:
     from kbplacer.board_modifier import (
-        get_footprint,
         get_position,
         set_position,
         set_side,
@@ -44,19 +43,25 @@ except Exception:
         BACK = True
 
 
+# internal units scale, used instead of calling `pcbnew.FromMM` for each value,
+# `int(x * IU_PER_MM)` truncates the same way as `pcbnew.FromMM`
+IU_PER_MM = pcbnew.FromMM(1)
+
+
 def get_board_with_one_switch(
     request, footprint: str, number_of_diodes: int = 1
 ) -> Tuple[pcbnew.BOARD, pcbnew.FOOTPRINT, List[pcbnew.FOOTPRINT]]:
     board = pcbnew.CreateEmptyBoard()
     net_count = board.GetNetCount()
     switch_diode_net = pcbnew.NETINFO_ITEM(board, "Net-(D-Pad2)", net_count)
-    update_netinfo(board, switch_diode_net)
-    board.Add(switch_diode_net)
+    column_net = pcbnew.NETINFO_ITEM(board, "COL1", net_count + 1)
+    for net in (switch_diode_net, column_net):
+        update_netinfo(board, net)
+        board.Add(net)
 
     switch = add_switch_footprint(board, request, 1, footprint=footprint)
-    for p in switch.Pads():
-        if p.GetNumber() == "2":
-            p.SetNet(switch_diode_net)
+    switch.FindPadByNumber("1").SetNet(column_net)
+    switch.FindPadByNumber("2").SetNet(switch_diode_net)
 
     diodes = []
     for i in range(number_of_diodes):
@@ -64,14 +69,6 @@ def get_board_with_one_switch(
         diode.FindPadByNumber("2").SetNet(switch_diode_net)
         diodes.append(diode)
 
-    column_net = pcbnew.NETINFO_ITEM(board, "COL1", net_count + 1)
-    update_netinfo(board, column_net)
-    board.Add(column_net)
-
-    for p in switch.Pads():
-        if p.GetNumber() == "1":
-            p.SetNet(column_net)
-
     return board, switch, diodes
 
 
@@ -82,76 +79,71 @@ def save_and_render(board: pcbnew.BOARD, tmpdir, request) -> None:
 
 
 def assert_board_tracks(
-    expected: list[Tuple[int, int]] | None, board: pcbnew.BOARD
+    expected: Sequence[Tuple[int, int]] | None, board: pcbnew.BOARD
 ) -> None:
-    expected_wx = [pcbnew.wxPoint(x[0], x[1]) for x in expected] if expected else None
-    points = []
+    points = set()
     for track in board.GetTracks():
-        start = track.GetStart()
-        if start not in points:
-            points.append(start)
-        end = track.GetEnd()
-        if end not in points:
-            points.append(end)
-
-    if expected_wx:
-        assert equal_ignore_order(points, expected_wx)
+        for point in (track.GetStart(), track.GetEnd()):
+            points.add((point.x, point.y))
+
+    if expected:
+        assert sorted(points) == sorted(expected)
     else:
         assert not points
 
 
-@pytest.mark.parametrize(
-    "position,orientation,expected",
-    [
-        # fmt: off
-        # simple cases when pads in line, expecting single segment track:
-        ((-4,  0),   0, [(-410000, -5080000), (2540000, -5080000)]),
-        (( 0,  4),  90, [(2540000, -2130000), (2540000, -5080000)]),
-        (( 4,  0), 180, [(5490000, -5080000), (2540000, -5080000)]),
-        (( 0, -4), 270, [(2540000, -8030000), (2540000, -5080000)]),
-        # cases where need to route with two segment track:
-        ((-4,  1),   0, [(-410000,  -4080000), (590000,   -5080000), (2540000, -5080000)]),
-        ((-4, -1),   0, [(-410000,  -6080000), (590000,   -5080000), (2540000, -5080000)]),
-        ((-4,  1),  90, [(-1460000, -5130000), (-1410000, -5080000), (2540000, -5080000)]),
-        ((-4, -1),  90, [(-1460000, -7130000), (590000,   -5080000), (2540000, -5080000)]),
-        ((-4,  1), 180, [(-2510000, -4080000), (-1510000, -5080000), (2540000, -5080000)]),
-        ((-4, -1), 180, [(-2510000, -6080000), (-1510000, -5080000), (2540000, -5080000)]),
-        ((-4,  1), 270, [(-1460000, -3030000), (590000,   -5080000), (2540000, -5080000)]),
-        ((-4, -1), 270, [(-1460000, -5030000), (-1410000, -5080000), (2540000, -5080000)]),
-        (( 1, 10),   0, [(4590000,   4920000), (2540000,   2870000), (2540000, -5080000)]),
-        ((-1, 10),   0, [(2590000,   4920000), (2540000,   4870000), (2540000, -5080000)]),
-        (( 1, 10),  90, [(3540000,   3870000), (2540000,   2870000), (2540000, -5080000)]),
-        ((-1, 10),  90, [(1540000,   3870000), (2540000,   2870000), (2540000, -5080000)]),
-        (( 1, 10), 180, [(2490000,   4920000), (2540000,   4870000), (2540000, -5080000)]),
-        ((-1, 10), 180, [(490000,    4920000), (2540000,   2870000), (2540000, -5080000)]),
-        (( 1, 10), 270, [(3540000,   5970000), (2540000,   4970000), (2540000, -5080000)]),
-        ((-1, 10), 270, [(1540000,   5970000), (2540000,   4970000), (2540000, -5080000)]),
-        (( 4,  1),   0, [(7590000,  -4080000), (6590000,  -5080000), (2540000, -5080000)]),
-        (( 4, -1),   0, [(7590000,  -6080000), (6590000,  -5080000), (2540000, -5080000)]),
-        (( 4,  1),  90, [(6540000,  -5130000), (6490000,  -5080000), (2540000, -5080000)]),
-        (( 4, -1),  90, [(6540000,  -7130000), (4490000,  -5080000), (2540000, -5080000)]),
-        (( 4,  1), 180, [(5490000,  -4080000), (4490000,  -5080000), (2540000, -5080000)]),
-        (( 4, -1), 180, [(5490000,  -6080000), (4490000,  -5080000), (2540000, -5080000)]),
-        (( 4,  1), 270, [(6540000,  -3030000), (4490000,  -5080000), (2540000, -5080000)]),
-        (( 4, -1), 270, [(6540000,  -5030000), (6490000,  -5080000), (2540000, -5080000)]),
-        (( 1, -4),   0, [(4590000,  -9080000), (2540000,  -7030000), (2540000, -5080000)]),
-        ((-1, -4),   0, [(2590000,  -9080000), (2540000,  -9030000), (2540000, -5080000)]),
-        (( 1, -4),  90, [(3540000, -10130000), (2540000,  -9130000), (2540000, -5080000)]),
-        ((-1, -4),  90, [(1540000, -10130000), (2540000,  -9130000), (2540000, -5080000)]),
-        (( 1, -4), 180, [(2490000,  -9080000), (2540000,  -9030000), (2540000, -5080000)]),
-        ((-1, -4), 180, [(490000,   -9080000), (2540000,  -7030000), (2540000, -5080000)]),
-        (( 1, -4), 270, [(3540000,  -8030000), (2540000,  -7030000), (2540000, -5080000)]),
-        ((-1, -4), 270, [(1540000,  -8030000), (2540000,  -7030000), (2540000, -5080000)]),
-        # these positions used to be difficult for router but works after adding second
-        # attempt with track posture changed, if the first try failed:
-        ((5.5, 5),  90, [(8040000,  -1130000), (4090000,  -5080000), (2540000, -5080000)]),
-        ((7, 10),   90, [(9540000,   3870000), (9540000,   1920000), (2540000, -5080000)]),
-        # special cases testing some edge cases or special conditions:
-        # cases to difficult for router. Two segment track would collide with footprint:
-        ((-7, 10), 90, None),
-        # fmt: on
-    ],
+DIODE_SWITCH_ROUTES = (
+    # fmt: off
+    # simple cases when pads in line, expecting single segment track:
+    ((-4,  0),   0, ((-410000, -5080000), (2540000, -5080000))),
+    (( 0,  4),  90, ((2540000, -2130000), (2540000, -5080000))),
+    (( 4,  0), 180, ((5490000, -5080000), (2540000, -5080000))),
+    (( 0, -4), 270, ((2540000, -8030000), (2540000, -5080000))),
+    # cases where need to route with two segment track:
+    ((-4,  1),   0, ((-410000,  -4080000), (590000,   -5080000), (2540000, -5080000))),
+    ((-4, -1),   0, ((-410000,  -6080000), (590000,   -5080000), (2540000, -5080000))),
+    ((-4,  1),  90, ((-1460000, -5130000), (-1410000, -5080000), (2540000, -5080000))),
+    ((-4, -1),  90, ((-1460000, -7130000), (590000,   -5080000), (2540000, -5080000))),
+    ((-4,  1), 180, ((-2510000, -4080000), (-1510000, -5080000), (2540000, -5080000))),
+    ((-4, -1), 180, ((-2510000, -6080000), (-1510000, -5080000), (2540000, -5080000))),
+    ((-4,  1), 270, ((-1460000, -3030000), (590000,   -5080000), (2540000, -5080000))),
+    ((-4, -1), 270, ((-1460000, -5030000), (-1410000, -5080000), (2540000, -5080000))),
+    (( 1, 10),   0, ((4590000,   4920000), (2540000,   2870000), (2540000, -5080000))),
+    ((-1, 10),   0, ((2590000,   4920000), (2540000,   4870000), (2540000, -5080000))),
+    (( 1, 10),  90, ((3540000,   3870000), (2540000,   2870000), (2540000, -5080000))),
+    ((-1, 10),  90, ((1540000,   3870000), (2540000,   2870000), (2540000, -5080000))),
+    (( 1, 10), 180, ((2490000,   4920000), (2540000,   4870000), (2540000, -5080000))),
+    ((-1, 10), 180, ((490000,    4920000), (2540000,   2870000), (2540000, -5080000))),
+    (( 1, 10), 270, ((3540000,   5970000), (2540000,   4970000), (2540000, -5080000))),
+    ((-1, 10), 270, ((1540000,   5970000), (2540000,   4970000), (2540000, -5080000))),
+    (( 4,  1),   0, ((7590000,  -4080000), (6590000,  -5080000), (2540000, -5080000))),
+    (( 4, -1),   0, ((7590000,  -6080000), (6590000,  -5080000), (2540000, -5080000))),
+    (( 4,  1),  90, ((6540000,  -5130000), (6490000,  -5080000), (2540000, -5080000))),
+    (( 4, -1),  90, ((6540000,  -7130000), (4490000,  -5080000), (2540000, -5080000))),
+    (( 4,  1), 180, ((5490000,  -4080000), (4490000,  -5080000), (2540000, -5080000))),
+    (( 4, -1), 180, ((5490000,  -6080000), (4490000,  -5080000), (2540000, -5080000))),
+    (( 4,  1), 270, ((6540000,  -3030000), (4490000,  -5080000), (2540000, -5080000))),
+    (( 4, -1), 270, ((6540000,  -5030000), (6490000,  -5080000), (2540000, -5080000))),
+    (( 1, -4),   0, ((4590000,  -9080000), (2540000,  -7030000), (2540000, -5080000))),
+    ((-1, -4),   0, ((2590000,  -9080000), (2540000,  -9030000), (2540000, -5080000))),
+    (( 1, -4),  90, ((3540000, -10130000), (2540000,  -9130000), (2540000, -5080000))),
+    ((-1, -4),  90, ((1540000, -10130000), (2540000,  -9130000), (2540000, -5080000))),
+    (( 1, -4), 180, ((2490000,  -9080000), (2540000,  -9030000), (2540000, -5080000))),
+    ((-1, -4), 180, ((490000,   -9080000), (2540000,  -7030000), (2540000, -5080000))),
+    (( 1, -4), 270, ((3540000,  -8030000), (2540000,  -7030000), (2540000, -5080000))),
+    ((-1, -4), 270, ((1540000,  -8030000), (2540000,  -7030000), (2540000, -5080000))),
+    # these positions used to be difficult for router but works after adding second
+    # attempt with track posture changed, if the first try failed:
+    ((5.5, 5),  90, ((8040000,  -1130000), (4090000,  -5080000), (2540000, -5080000))),
+    ((7, 10),   90, ((9540000,   3870000), (9540000,   1920000), (2540000, -5080000))),
+    # special cases testing some edge cases or special conditions:
+    # cases to difficult for router. Two segment track would collide with footprint:
+    ((-7, 10), 90, None),
+    # fmt: on
 )
+
+
+@pytest.mark.parametrize("position,orientation,expected", DIODE_SWITCH_ROUTES)
 @pytest.mark.parametrize("side", [Side.FRONT, Side.BACK])
 def test_diode_switch_routing(
     position, orientation, side, expected, tmpdir, request
@@ -163,8 +155,8 @@ def test_diode_switch_routing(
     switch_pad_position = switch_pad.GetPosition()
 
     diode_position = pcbnew.wxPoint(
-        switch_pad_position.x + pcbnew.FromMM(position[0]),
-        switch_pad_position.y + pcbnew.FromMM(position[1]),
+        switch_pad_position.x + int(position[0] * IU_PER_MM),
+        switch_pad_position.y + int(position[1] * IU_PER_MM),
     )
     set_position(diodes[0], diode_position)
     set_side(diodes[0], side)
@@ -231,21 +223,24 @@ def get_2x2_layout_path(request) -> str:
     return f"{request.fspath.dirname}/../examples/2x2/kle-internal.json"
 
 
+NETS_2X2 = (
+    "COL0",
+    "COL1",
+    "ROW0",
+    "ROW1",
+    "Net-D1-Pad2",
+    "Net-D2-Pad2",
+    "Net-D3-Pad2",
+    "Net-D4-Pad2",
+)
+
+
 def add_2x2_nets(board):
     net_count = board.GetNetCount()
-    for i, n in enumerate(
-        [
-            "COL0",
-            "COL1",
-            "ROW0",
-            "ROW1",
-            "Net-D1-Pad2",
-            "Net-D2-Pad2",
-            "Net-D3-Pad2",
-            "Net-D4-Pad2",
-        ]
-    ):
-        net = pcbnew.NETINFO_ITEM(board, n, net_count + i)
+    nets = [
+        pcbnew.NETINFO_ITEM(board, n, net_count + i) for i, n in enumerate(NETS_2X2)
+    ]
+    for net in nets:
         update_netinfo(board, net)
         board.Add(net)
     return board.GetNetInfo().NetsByName()
@@ -254,20 +249,29 @@ def add_2x2_nets(board):
 def get_board_for_2x2_example(request):
     board = pcbnew.CreateEmptyBoard()
     netcodes_map = add_2x2_nets(board)
+
+    def _set_nets(footprint: pcbnew.FOOTPRINT, pad1_net: str, pad2_net: str) -> None:
+        footprint.FindPadByNumber("1").SetNet(netcodes_map[pad1_net])
+        footprint.FindPadByNumber("2").SetNet(netcodes_map[pad2_net])
+
     for i in range(1, 5):
+        switch_diode_net = f"Net-D{i}-Pad2"
         switch = add_switch_footprint(board, request, i)
-        switch.FindPadByNumber("1").SetNet(netcodes_map[f"COL{(i - 1) & 0x01}"])
-        switch.FindPadByNumber("2").SetNet(netcodes_map[f"Net-D{i}-Pad2"])
+        _set_nets(switch, f"COL{(i - 1) & 0x01}", switch_diode_net)
         diode = add_diode_footprint(board, request, i)
-        diode.FindPadByNumber("1").SetNet(netcodes_map[f"ROW{i // 3}"])
-        diode.FindPadByNumber("2").SetNet(netcodes_map[f"Net-D{i}-Pad2"])
+        _set_nets(diode, f"ROW{i // 3}", switch_diode_net)
     return board
 
 
+def footprint_map(board: pcbnew.BOARD) -> Dict[str, pcbnew.FOOTPRINT]:
+    return {f.GetReference(): f for f in board.GetFootprints()}
+
+
 def assert_2x2_layout_switches(
     board: pcbnew.BOARD, key_distance: Tuple[float, float]
 ) -> None:
-    switches = [get_footprint(board, f"SW{i}") for i in range(1, 5)]
+    footprints = footprint_map(board)
+    switches = [footprints[f"SW{i}"] for i in range(1, 5)]
     positions = [get_position(switch) for switch in switches]
     assert positions[0] == pcbnew.wxPointMM(key_distance[0] * 2, key_distance[1] * 2)
     assert positions[1] - positions[0] == pcbnew.wxPointMM(key_distance[0], 0)
@@ -304,8 +308,9 @@ def test_switch_distance(key_distance, tmpdir, request) -> None:
     save_and_render(board, tmpdir, request)
 
     assert_2x2_layout_switches(board, key_distance)
-    switches = [get_footprint(board, f"SW{i}") for i in range(1, 5)]
-    diodes = [get_footprint(board, f"D{i}") for i in range(1, 5)]
+    footprints = footprint_map(board)
+    switches = [footprints[f"SW{i}"] for i in range(1, 5)]
+    diodes = [footprints[f"D{i}"] for i in range(1, 5)]
     for switch, diode in zip(switches, diodes):
         x, y = diode_position.x, diode_position.y
         assert get_position(diode) == get_position(switch) + pcbnew.wxPointMM(x, y)
@@ -323,7 +328,8 @@ def test_diode_placement_ignore(tmpdir, request) -> None:
     save_and_render(board, tmpdir, request)
 
     assert_2x2_layout_switches(board, (19.05, 19.05))
-    diodes = [get_footprint(board, f"D{i}") for i in range(1, 5)]
+    footprints = footprint_map(board)
+    diodes = [footprints[f"D{i}"] for i in range(1, 5)]
     positions = [get_position(diode) for diode in diodes]
     for pos in positions:
         assert pos == pcbnew.wxPoint(0, 0)
@@ -346,12 +352,23 @@ def test_placer_invalid_layout(tmpdir, request) -> None:
         key_placer.run(layout_path, key_info, diode_info, True)
 
 
-def test_switch_iterator_default_mode(request) -> None:
+@functools.lru_cache(maxsize=None)
+def read_layout(path: str) -> bytes:
+    return Path(path).read_bytes()
+
+
+@pytest.fixture(scope="module")
+def board_2x2_with_key_matrix(request) -> Tuple[pcbnew.BOARD, KeyMatrix]:
+    # switch iterator tests do not modify board, it can be shared.
+    # Board is returned as well to keep it alive as long as key matrix is used
     board = get_board_for_2x2_example(request)
-    key_matrix = KeyMatrix(board, "SW{}", "D{}")
-    with open(get_2x2_layout_path(request), "r") as f:
-        layout = json.load(f)
-        keyboard = get_keyboard(layout)
+    return board, KeyMatrix(board, "SW{}", "D{}")
+
+
+def test_switch_iterator_default_mode(request, board_2x2_with_key_matrix) -> None:
+    _, key_matrix = board_2x2_with_key_matrix
+    layout = json.loads(read_layout(get_2x2_layout_path(request)))
+    keyboard = get_keyboard(layout)
 
     iterator = KeyboardSwitchIterator(keyboard, key_matrix)
     expected_keys = iter(keyboard.keys)
@@ -361,12 +378,12 @@ def test_switch_iterator_default_mode(request) -> None:
         assert footprint.GetReference() == next(expected_footprints)
 
 
-def test_switch_iterator_explicit_annotation_mode(request) -> None:
-    board = get_board_for_2x2_example(request)
-    key_matrix = KeyMatrix(board, "SW{}", "D{}")
-    with open(get_2x2_layout_path(request), "r") as f:
-        layout = json.load(f)
-        keyboard = get_keyboard(layout)
+def test_switch_iterator_explicit_annotation_mode(
+    request, board_2x2_with_key_matrix
+) -> None:
+    _, key_matrix = board_2x2_with_key_matrix
+    layout = json.loads(read_layout(get_2x2_layout_path(request)))
+    keyboard = get_keyboard(layout)
     expected_order = ["3", "1", "4", "2"]
     for i, k in enumerate(keyboard.keys):
         k.set_label(KeyboardSwitchIterator.EXPLICIT_ANNOTATION_LABEL, expected_order[i])
@@ -378,17 +395,15 @@ def test_switch_iterator_explicit_annotation_mode(request) -> None:
         assert footprint.GetReference() == next(expected_footprints)
 
 
-def test_switch_iterator_default_mode_ignore_decal(request) -> None:
-    board = get_board_for_2x2_example(request)
-    key_matrix = KeyMatrix(board, "SW{}", "D{}")
-    with open(get_2x2_layout_path(request), "r") as f:
-        layout = json.load(f)
-        # add some decal keys
-        for key in list(layout["keys"]):
-            k = copy.copy(key)
-            k["decal"] = True
-            layout["keys"].append(k)
-        keyboard = get_keyboard(layout)
+def test_switch_iterator_default_mode_ignore_decal(
+    request, board_2x2_with_key_matrix
+) -> None:
+    _, key_matrix = board_2x2_with_key_matrix
+    layout = json.loads(read_layout(get_2x2_layout_path(request)))
+    # add some decal keys
+    for key in list(layout["keys"]):
+        layout["keys"].append({**key, "decal": True})
+    keyboard = get_keyboard(layout)
 
     iterator = KeyboardSwitchIterator(keyboard, key_matrix)
     expected_keys = iter(keyboard.keys[0:4])
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import importlib
 import json
 import locale
 import logging
@@ -9,32 +10,35 @@ import subprocess
 import sys
 import unittest
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 import pytest
 import yaml
 
+from kbplacer import kle_serial
+from kbplacer._json import loads as json_loads
+from kbplacer.kle_serial import (
+    Keyboard,
+    MatrixAnnotatedKeyboard,
+    get_keyboard_from_file,
+    parse_ergogen_points,
+    parse_kle,
+    parse_via,
+)
+
 from .conftest import equal_ignore_order
 
-try:
-    from kbplacer.kle_serial import (
-        Keyboard,
-        MatrixAnnotatedKeyboard,
-        get_keyboard_from_file,
-        parse_ergogen_points,
-        parse_kle,
-        parse_via,
-    )
-except Exception:
-    pass
+# prefer libyaml based loader when PyYAML was built with it
+_YLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 logger = logging.getLogger(__name__)
 
 
+_MINIFY_TABLE = str.maketrans("", "", "\n ")
+
+
 def __minify(string: str) -> str:
-    for ch in ["\n", " "]:
-        string = string.replace(ch, "")
-    return string
+    return string.translate(_MINIFY_TABLE)
 
 
 # single key layouts with various labels:
@@ -158,19 +162,18 @@ def test_if_produces_valid_json() -> None:
     )
 
 
-def __get_invalid_parse_parameters():
-    test_params = []
-    test_params.append(pytest.param([], id="empty-list"))
-    test_params.append(pytest.param({}, id="empty-dict"))
-    test_params.append(pytest.param("", id="empty-string"))
-    test_params.append(pytest.param('[["x"]]', id="some-string"))
-    test_params.append(pytest.param(["", ""], id="list-of-unexpected-type"))
-    test_params.append(pytest.param([{}, {}], id="list-with-wrong-dict-position"))
-    test_params.append(pytest.param([[], {}], id="list-with-wrong-dict-position-2"))
-    return test_params
+_INVALID_PARSE_PARAMS = (
+    pytest.param([], id="empty-list"),
+    pytest.param({}, id="empty-dict"),
+    pytest.param("", id="empty-string"),
+    pytest.param('[["x"]]', id="some-string"),
+    pytest.param(["", ""], id="list-of-unexpected-type"),
+    pytest.param([{}, {}], id="list-with-wrong-dict-position"),
+    pytest.param([[], {}], id="list-with-wrong-dict-position-2"),
+)
 
 
-@pytest.mark.parametrize("input_object", __get_invalid_parse_parameters())
+@pytest.mark.parametrize("input_object", _INVALID_PARSE_PARAMS)
 def test_parse_kle_invalid_schema(input_object) -> None:
     with pytest.raises(RuntimeError):
         parse_kle(input_object)
@@ -193,61 +196,56 @@ def test_keyboard_from_invalid_schema() -> None:
         Keyboard.from_json({})  # type: ignore
 
 
-def get_reference(path: Path):
-    with open(path, "r") as f:
-        layout: str = f.read()
-        reference_dict = json.loads(layout)
+def get_reference(path: Path) -> Keyboard:
+    with open(path, "rb") as f:
+        reference_dict = json_loads(f.read())
         return Keyboard.from_json(reference_dict)
 
 
-def __get_parameters():
-    test_params = []
-    # some standard layouts and complex samples from keyboard-layout-editor.com
-    kle_presets = [
-        "ansi-104-big-ass-enter",
-        "ansi-104",
-        "apple-wireless",
-        "atreus",
-        "ergodox",
-        "iso-105",
-        "kinesis-advantage",
-        "symbolics-spacecadet",
-    ]
-    for f in kle_presets:
-        param = pytest.param(
-            f"./data/kle-layouts/{f}.json",
-            f"./data/kle-layouts/{f}-internal.json",
-            id=f,
-        )
-        test_params.append(param)
-
-    examples = ["2x2", "3x2-sizes", "2x3-rotations", "1x4-rotations-90-step"]
-    for e in examples:
-        param = pytest.param(
-            f"../examples/{e}/kle-annotated.json",
-            f"../examples/{e}/kle-internal.json",
-            id=e,
-        )
-        test_params.append(param)
-
-    return test_params
+# some standard layouts and complex samples from keyboard-layout-editor.com
+_KLE_PRESETS = (
+    "ansi-104-big-ass-enter",
+    "ansi-104",
+    "apple-wireless",
+    "atreus",
+    "ergodox",
+    "iso-105",
+    "kinesis-advantage",
+    "symbolics-spacecadet",
+)
+_EXAMPLES = ("2x2", "3x2-sizes", "2x3-rotations", "1x4-rotations-90-step")
+_PARAMS = tuple(
+    pytest.param(
+        f"./data/kle-layouts/{f}.json",
+        f"./data/kle-layouts/{f}-internal.json",
+        id=f,
+    )
+    for f in _KLE_PRESETS
+) + tuple(
+    pytest.param(
+        f"../examples/{e}/kle-annotated.json",
+        f"../examples/{e}/kle-internal.json",
+        id=e,
+    )
+    for e in _EXAMPLES
+)
 
 
-@pytest.mark.parametrize("layout_file,reference_file", __get_parameters())
+@pytest.mark.parametrize("layout_file,reference_file", _PARAMS)
 def test_with_kle_references(layout_file, reference_file, request) -> None:
     test_dir = request.fspath.dirname
 
     reference = get_reference(Path(test_dir) / reference_file)
 
-    with open(Path(test_dir) / layout_file, "r") as f:
-        layout = json.load(f)
-        result = parse_kle(layout)
-        assert result == reference
+    with open(Path(test_dir) / layout_file, "rb") as f:
+        data = f.read()
+    layout = json_loads(data)
+    result = parse_kle(layout)
+    assert result == reference
 
-        f.seek(0)
-        kle_result = json.loads("[" + __minify(result.to_kle()) + "]")
-        expected = json.loads(__minify(f.read()))
-        assert kle_result == expected
+    kle_result = json_loads("[" + __minify(result.to_kle()) + "]")
+    expected = json_loads(__minify(data.decode("utf-8")))
+    assert kle_result == expected
 
 
 @pytest.mark.parametrize("example", ["2x2", "1x2-with-2U-bottom", "1x1-rotated"])
@@ -259,12 +257,17 @@ def test_with_ergogen(example, request) -> None:
     )
 
     # very simple example layout
-    with open(Path(test_dir) / f"data/ergogen-layouts/{example}.json", "r") as f:
-        layout = json.load(f)
+    with open(Path(test_dir) / f"data/ergogen-layouts/{example}.json", "rb") as f:
+        layout = json_loads(f.read())
         result = parse_ergogen_points(layout)
         assert result == reference
 
 
+def _expected_matrix_keyboard(layout) -> MatrixAnnotatedKeyboard:
+    keyboard = parse_kle(layout)
+    return MatrixAnnotatedKeyboard(meta=keyboard.meta, keys=keyboard.keys)
+
+
 def _layout_collapse(layout) -> MatrixAnnotatedKeyboard:
     tmp = parse_kle(layout)
     keyboard = MatrixAnnotatedKeyboard(meta=tmp.meta, keys=tmp.keys)
@@ -286,11 +289,7 @@ def test_iso_enter_layout_collapse() -> None:
     ]
     # fmt: on
     result = _layout_collapse(layout)
-    expected_keyboard = parse_kle(expected)
-    expected_keyboard = MatrixAnnotatedKeyboard(
-        meta=expected_keyboard.meta, keys=expected_keyboard.keys
-    )
-    assert result == expected_keyboard
+    assert result == _expected_matrix_keyboard(expected)
 
 
 def test_bottom_row_collapse_no_extra_keys() -> None:
@@ -307,11 +306,7 @@ def test_bottom_row_collapse_no_extra_keys() -> None:
     ]
     # fmt: on
     result = _layout_collapse(layout)
-    expected_keyboard = parse_kle(expected)
-    expected_keyboard = MatrixAnnotatedKeyboard(
-        meta=expected_keyboard.meta, keys=expected_keyboard.keys
-    )
-    assert result == expected_keyboard
+    assert result == _expected_matrix_keyboard(expected)
     assert len(result.alternative_keys) == 0
 
 
@@ -326,11 +321,7 @@ def test_bottom_row_decal_handling() -> None:
     ]
     # fmt: on
     result = _layout_collapse(layout)
-    expected_keyboard = parse_kle(expected)
-    expected_keyboard = MatrixAnnotatedKeyboard(
-        meta=expected_keyboard.meta, keys=expected_keyboard.keys
-    )
-    assert result == expected_keyboard
+    assert result == _expected_matrix_keyboard(expected)
     assert len(result.alternative_keys) == 1
 
 
@@ -349,11 +340,7 @@ def test_collapse_detects_duplicated_keys() -> None:
     ]
     # fmt: on
     result = _layout_collapse(layout)
-    expected_keyboard = parse_kle(expected)
-    expected_keyboard = MatrixAnnotatedKeyboard(
-        meta=expected_keyboard.meta, keys=expected_keyboard.keys
-    )
-    assert result == expected_keyboard
+    assert result == _expected_matrix_keyboard(expected)
     assert len(result.alternative_keys) == 2
 
 
@@ -365,20 +352,42 @@ def test_with_via_layouts(request, example) -> None:
         reference = get_reference(Path(test_dir) / "data/via-layouts" / filename)
         return MatrixAnnotatedKeyboard(reference.meta, reference.keys)
 
-    with open(Path(test_dir) / f"data/via-layouts/{example}.json", "r") as f:
-        layout = json.load(f)
-        result = parse_via(layout)
-        assert result == _reference_keyboard(f"{example}-internal.json")
-        result.collapse()
-        reference_collapsed = _reference_keyboard(f"{example}-internal-collapsed.json")
-        assert result.keys == reference_collapsed.keys
-        # order after collapsing might be different but that's not important right now.
-        assert equal_ignore_order(
-            result.alternative_keys, reference_collapsed.alternative_keys
-        )
+    with open(Path(test_dir) / f"data/via-layouts/{example}.json", "rb") as f:
+        layout = json_loads(f.read())
+    result = parse_via(layout)
+    assert result == _reference_keyboard(f"{example}-internal.json")
+    result.collapse()
+    reference_collapsed = _reference_keyboard(f"{example}-internal-collapsed.json")
+    assert result.keys == reference_collapsed.keys
+    # order after collapsing might be different but that's not important right now.
+    assert equal_ignore_order(
+        result.alternative_keys, reference_collapsed.alternative_keys
+    )
 
 
 class TestKleSerialCli:
+    def _flatten_args(self, args: dict[str, str]) -> List[str]:
+        result = []
+        for k, v in args.items():
+            result.append(k)
+            if v:
+                result.append(v)
+        return result
+
+    def _run_in_process(
+        self,
+        monkeypatch,
+        package_path,
+        package_name,
+        args: dict[str, str] = {},
+    ) -> None:
+        with monkeypatch.context() as m:
+            m.chdir(package_path)
+            m.syspath_prepend(str(package_path))
+            module = importlib.import_module(f"{package_name}.kle_serial")
+            if module.main(self._flatten_args(args)) != 0:
+                raise Exception("kle_serial main failed")
+
     def _run_subprocess(
         self,
         package_path,
@@ -390,10 +399,7 @@ class TestKleSerialCli:
             "-m",
             f"{package_name}.kle_serial",
         ]
-        for k, v in args.items():
-            kbplacer_args.append(k)
-            if v:
-                kbplacer_args.append(v)
+        kbplacer_args.extend(self._flatten_args(args))
 
         env = os.environ.copy()
         p = subprocess.Popen(
@@ -417,7 +423,7 @@ class TestKleSerialCli:
         "example", ["2x2", "3x2-sizes", "2x3-rotations", "1x4-rotations-90-step"]
     )
     def test_kle_file_convert(
-        self, package_path, package_name, example_isolation
+        self, monkeypatch, package_path, package_name, example_isolation
     ) -> None:
         raw = example_isolation[0]
         raw_tmp = Path(raw).with_suffix(".json.tmp")
@@ -429,7 +435,8 @@ class TestKleSerialCli:
         with open(internal, "r") as f:
             internal_json = json.load(f)
 
-        self._run_subprocess(
+        self._run_in_process(
+            monkeypatch,
             package_path,
             package_name,
             {
@@ -443,7 +450,8 @@ class TestKleSerialCli:
         with open(internal_tmp, "r") as f:
             assert json.load(f) == internal_json
 
-        self._run_subprocess(
+        self._run_in_process(
+            monkeypatch,
             package_path,
             package_name,
             {
@@ -466,14 +474,21 @@ class TestKleSerialCli:
         ],
     )
     def test_ergogen_file_convert(
-        self, request, tmpdir, package_path, package_name, example, ergogen_filter
+        self,
+        request,
+        tmpdir,
+        monkeypatch,
+        package_path,
+        package_name,
+        example,
+        ergogen_filter,
     ) -> None:
         test_dir = request.fspath.dirname
         data_dir = f"{test_dir}/data"
 
         layout_file = f"{tmpdir}/layout.json"
         with open(f"{data_dir}/ergogen-layouts/{example}-points.yaml", "r") as f:
-            y = yaml.safe_load(f)
+            y = yaml.load(f, Loader=_YLoader)
             with open(layout_file, "w") as f2:
                 json.dump(y, f2)
         tmp_file = Path(layout_file).with_suffix(".json.tmp")
@@ -487,7 +502,7 @@ class TestKleSerialCli:
         }
         if ergogen_filter:
             args["-ergogen-filter"] = ergogen_filter
-        self._run_subprocess(package_path, package_name, args)
+        self._run_in_process(monkeypatch, package_path, package_name, args)
 
         with open(f"{data_dir}/ergogen-layouts/{example}-reference.json", "r") as f:
             reference = json.load(f)
@@ -498,6 +513,7 @@ class TestKleSerialCli:
     def test_ergogen_file_convert_direct_yaml(
         self, request, tmpdir, package_path, package_name
     ) -> None:
+        # runs converter as separate process to cover module entry point
         test_dir = request.fspath.dirname
         data_dir = f"{test_dir}/data"
         example = "absolem-simple"
@@ -532,3 +548,39 @@ def test_utf8_label(request) -> None:
     keyboard = get_keyboard_from_file(layout_path)
     assert len(keyboard.keys) == 1
     assert keyboard.keys[0].labels == ["😊"]
+
+
+def test_keyboard_from_file_cache(request, tmpdir, monkeypatch) -> None:
+    test_dir = request.fspath.dirname
+    layout_path = Path(tmpdir) / "kle-internal.json"
+    shutil.copy(f"{test_dir}/../examples/2x2/kle-internal.json", layout_path)
+    cache_dir = Path(tmpdir) / "cache"
+
+    keyboard = get_keyboard_from_file(str(layout_path), str(cache_dir))
+    cached_files = list(cache_dir.glob("*.pkl"))
+    assert len(cached_files) == 1
+
+    # cache hit must not parse layout again
+    with monkeypatch.context() as m:
+
+        def _get_keyboard(layout):
+            msg = "Layout parsed instead of loaded from cache"
+            raise AssertionError(msg)
+
+        m.setattr(kle_serial, "get_keyboard", _get_keyboard)
+        cached_keyboard = get_keyboard_from_file(str(layout_path), str(cache_dir))
+    assert cached_keyboard == keyboard
+    assert list(cache_dir.glob("*.pkl")) == cached_files
+
+    # modified layout file must not use stale cache entry, which gets replaced
+    with open(layout_path, "r") as f:
+        layout = json.load(f)
+    layout["meta"]["name"] = "modified"
+    with open(layout_path, "w") as f:
+        json.dump(layout, f)
+
+    modified_keyboard = get_keyboard_from_file(str(layout_path), str(cache_dir))
+    assert modified_keyboard.meta.name == "modified"
+    new_cached_files = list(cache_dir.glob("*.pkl"))
+    assert len(new_cached_files) == 1
+    assert new_cached_files != cached_files